@@ -1,8 +1,8 @@
 from numbers import Number
-from typing import List, Optional
+from typing import Optional, Tuple
 
 
-class Layout(dict):
+class Layout:
     """
     Represents a rectangular layout area defined by its position and size.
 
@@ -13,7 +13,10 @@ class Layout(dict):
         height (int): The height of the layout.
     """
 
-    _keys = ['x', 'y', 'width', 'height']
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    _keys = ('x', 'y', 'width', 'height')
+    _keys_set = frozenset(_keys)
 
     def __init__(self, x: Number, y: Number, width: Number, height: Number, *args, **kwargs) -> None:
         """
@@ -25,7 +28,6 @@ class Layout(dict):
             width (int): The width of the layout.
             height (int): The height of the layout.
         """
-        super().__init__()
         self.x = x
         self.y = y
         self.width = width
@@ -51,16 +53,16 @@ class Layout(dict):
             key (str): The property name.
             value: The new value to be set for the given property.
         """
-        if key not in self._keys:
+        if key not in self._keys_set:
             return
         setattr(self, key, value)
 
-    def keys(self) -> List[str]:
+    def keys(self) -> Tuple[str, ...]:
         """
-        Returns the list of property names that can be accessed via subscript notation.
+        Returns the property names that can be accessed via subscript notation.
 
         Returns:
-            List[str]: A list of property names ('x', 'y', 'width', 'height').
+            Tuple[str, ...]: A tuple of property names ('x', 'y', 'width', 'height').
         """
         return self._keys
 
@@ -69,19 +71,18 @@ class Layout(dict):
         Returns key-value pairs of layout properties.
 
         Returns:
-            Iterator of tuples: An iterator over key-value pairs of layout properties.
+            Tuple of tuples: Key-value pairs of layout properties.
         """
-        return zip(self._keys, (self[k] for k in self._keys))
+        return ('x', self.x), ('y', self.y), ('width', self.width), ('height', self.height)
 
     def __iter__(self):
         """
         Allows iteration over layout property names.
 
-        Yields:
-            str: Names of the layout properties.
+        Returns:
+            Iterator[str]: Names of the layout properties.
         """
-        for k, v in self.items():
-            yield k
+        return iter(self._keys)
 
     def take_from_left(self, pixels: Number) -> 'Layout':
         """
@@ -164,10 +165,11 @@ class Layout(dict):
             bottom = top
         if right is None:
             right = left
-        self.take_from_left(left)
-        self.take_from_top(top)
-        self.take_from_right(right)
-        self.take_from_bottom(bottom)
+        # Same arithmetic as the four take_from_* calls, without building the discarded slices
+        self.x += left
+        self.y += top
+        self.width -= left + right
+        self.height -= top + bottom
         return self
 
 
@@ -6,17 +6,34 @@ Date Modified: 2023/11/09
 Version: 1.0
 License: MIT License
 """
+import sys
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
-from inspect import signature, Parameter
 from numbers import Number
-from typing import Optional, SupportsIndex, Union, Any, List, Type
+from typing import Callable, Dict, Optional, SupportsIndex, TextIO, Union, Any, List, Type
 
 from pyGTGraphics.properties import Colour
 from pyGTGraphics.storyboard import Storyboard
 from pyGTGraphics.text_properties import TextProperties
+from pyGTGraphics.xml_utils import escape_attrib, start_tag
 
-PAD_STR = "%i,%i,%i,%i"
+# Which of the given padding values fill each of the four sides, by number of values given
+PAD_INDICES = {1: (0, 0, 0, 0), 2: (0, 1, 0, 1), 3: (0, 1, 0, 1), 4: (0, 1, 2, 3)}
+# Concrete types accepted without falling back to isinstance() for abstract Arg types
+EXACT_TYPES = {Number: frozenset((int, float))}
+
+
+def _xml_name(attribute: str) -> str:
+    """
+    Convert a snake_case attribute name into the CamelCase name used by GT XML.
+
+    Args:
+        attribute (str): The Python attribute name (e.g. 'font_family').
+
+    Returns:
+        str: The XML attribute name (e.g. 'FontFamily').
+    """
+    return "".join(t.title() for t in attribute.split("_"))
 
 
 class Root:
@@ -63,8 +80,10 @@ class Root:
         Returns:
             Layer: The created layer object with the specified name, position, and dimensions.
         """
-        _x, _y = x or 0, y or 0
-        _w, _h = width or (self.width - _x), height or (self.height - _y)
+        _x = 0 if x is None else x
+        _y = 0 if y is None else y
+        _w = self.width - _x if width is None else width
+        _h = self.height - _y if height is None else height
         new_layer = Layer(name, _x, _y, _w, _h)
         self.layers[name] = new_layer
         return new_layer
@@ -84,8 +103,55 @@ class Root:
 
         return ET.ElementTree(comp_element)
 
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        """
+        Serialise the Root object directly through `write`, without building an ElementTree.
+
+        The output is the same as serialising `to_xml()` without indentation.
+
+        Args:
+            write (Callable[[str], object]): The function receiving the serialised text chunks.
+        """
+        attrib = {"Width": str(self.width), "Height": str(self.height)}
+        if not (self.layers or self.storyboards):
+            write(start_tag('Composition', attrib, empty=True))
+            return
+        write(start_tag('Composition', attrib))
+        for element in self.layers.values():
+            element.stream_xml(write)
+        for storyboard in self.storyboards:
+            storyboard.stream_xml(write)
+        write('</Composition>')
+
+    def write_to(self, file: TextIO) -> None:
+        """
+        Write the composition as XML into an open text file.
+
+        Args:
+            file (TextIO): The text stream to write to.
+        """
+        self.stream_xml(file.write)
+
+    def save(self, path: str, *, buffer: int = 1 << 20) -> None:
+        """
+        Save the composition as a standalone UTF-8 XML file.
+
+        The document is streamed in many small chunks, so the file is opened with a large
+        write buffer; a buffer much smaller than the document brings back one syscall per
+        few tags.
+
+        Args:
+            path (str): The path to the output file.
+            buffer (int): The size of the write buffer in bytes.
+        """
+        with open(path, "w", buffering=buffer, encoding="utf-8", errors="xmlcharrefreplace") as file:
+            file.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            self.write_to(file)
+
 
 class Layer:
+    __slots__ = ("name", "x", "y", "width", "height", "locked", "children")
+
     def __init__(self, name: str, x: int, y: int, width: int, height: int):
         self.name = name
         self.x = x
@@ -108,7 +174,7 @@ class Layer:
                 for arg in subclass._args:
                     attr = arg.attribute
                     typehint = arg.type.__name__ if arg.type else 'Any'
-                    default = f"= {arg.default}" if arg.default is not None else ""
+                    default = f"= {arg.default!r}" if arg.default is not None else ""
                     if default:
                         default_param.append(f"{attr}: '{typehint}' {default}")
                     else:
@@ -143,26 +209,44 @@ class Layer:
         #         args = ', '.join(args + non_default + default_param + end)
         #         file.write(f"    def create_{subclass.__name__.lower()}({args}) -> '{subclass.__name__}': ...\n")
 
+    def _attributes(self) -> Dict[str, str]:
+        return {
+            "Name": self.name,
+            "Dimensions": f"{int(self.width)},{int(self.height)},0",
+            "Locked": str(self.locked),
+        }
+
     def to_xml(self, parent):
-        element = ET.SubElement(
-            parent, 'Layer',
-            Name=self.name,
-            Dimensions=f"%i,%i,%i" % (self.width, self.height, 0),
-            Locked=str(self.locked)
-        )
+        element = ET.SubElement(parent, 'Layer', self._attributes())
         composition = ET.SubElement(element, 'Layer.Composition')
-        inner_composition = ET.SubElement(composition, 'Composition', Width=str(self.width),
-                                          Height=str(self.height))
+        inner_composition = ET.SubElement(composition, 'Composition',
+                                          {"Width": str(self.width), "Height": str(self.height)})
         for el in self.children:
             el.to_xml(inner_composition)
 
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        write(start_tag('Layer', self._attributes()))
+        write('<Layer.Composition>')
+        attrib = {"Width": str(self.width), "Height": str(self.height)}
+        if self.children:
+            write(start_tag('Composition', attrib))
+            for el in self.children:
+                el.stream_xml(write)
+            write('</Composition>')
+        else:
+            write(start_tag('Composition', attrib, empty=True))
+        write('</Layer.Composition></Layer>')
+
     def insert_children(
             self,
             type_of_object: Type['BaseGTObject'],
             index: SupportsIndex = -1, **kwargs
     ) -> Type['BaseGTObject']:
-        self.children.insert(index if index > 0 else len(self.children), type_of_object(**kwargs))
-        return self.children[index]
+        return self._insert(type_of_object(**kwargs), index)
+
+    def _insert(self, child: 'BaseGTObject', index: SupportsIndex = -1) -> 'BaseGTObject':
+        self.children.insert(index if index > 0 else len(self.children), child)
+        return child
 
     def create_textblock(
             self,
@@ -208,9 +292,14 @@ class Arg:
     type: Optional[type] = None
     default: Any = None
     optional: bool = True
+    # Written to XML in place of a None value
+    xml_default: Any = None
 
 
 class BaseGTObject:
+    # Subclasses declare slots for their own init_args
+    __slots__ = ("name", "x", "y", "width", "height", "fill", "stroke", "_attrib", "_start")
+
     _args: List[Arg] = [
         Arg("name", type=str, optional=False),
         Arg("x", type=Number, optional=False),
@@ -218,6 +307,9 @@ class BaseGTObject:
         Arg("width", type=Number, optional=False),
         Arg("height", type=Number, optional=False),
     ]
+    _arg_attributes = frozenset(a.attribute for a in _args)
+    # Colours are immutable, so every new object can share the same default instance
+    _DEFAULT_TRANSPARENT = Colour.from_hex("#00000000")
 
     def __getitem__(self, key):
         return getattr(self, key)
@@ -226,10 +318,13 @@ class BaseGTObject:
         setattr(self, key, value)
 
     def keys(self):
-        return [k.attribute for k in self._args if self[k.attribute] is not None]
+        return [key for key, _ in self.items()]
 
     def items(self):
-        return ((key, self[key]) for key in self.keys())
+        for a in self._args:
+            value = getattr(self, a.attribute)
+            if value is not None:
+                yield a.attribute, value
 
     def __iter__(self):
         return iter(self.keys())
@@ -237,51 +332,151 @@ class BaseGTObject:
     def __init_subclass__(cls, **_kwargs) -> None:
         super().__init_subclass__()
         cls._tag = _kwargs.get("tag", cls.__name__)
-        cls._args = []
+        cls._fill_tag = sys.intern(f"{cls._tag}.Fill")
+        cls._stroke_tag = sys.intern(f"{cls._tag}.Stroke")
+        cls._bounding_tag = sys.intern(f"{cls._tag}.Bounding")
+        # Brush subtrees are fixed apart from the colour, so streaming only fills in the value
+        cls._fill_template = (f'<{cls._fill_tag}><Brush Color="', f'" /></{cls._fill_tag}>')
+        cls._stroke_template = (f'<{cls._stroke_tag}><Brush Color="', f'" /></{cls._stroke_tag}>')
+        args: dict[str, Arg] = {}
         for parent in cls.__mro__[1:-1]:
-            if not hasattr(parent, "_args"):
-                continue
-            cls._args.extend([a for a in getattr(parent, "_args") if a not in cls._args])
-        cls._args.extend(_kwargs.get("init_args", []))
-        sig = signature(cls.create)
-        parameters = list(sig.parameters.values())[2:]  # Skip 'cls' and 'parent'
-
-        # Define the method with the specific parameters
-        def layer_method(self, *args, **kwargs):
-            for i, arg in enumerate(args):
-                argument = cls._args[i]
-                kwargs[argument.attribute] = arg
-            return cls.create(self, **kwargs)
-
-        # Set the name of the function
+            for a in getattr(parent, "_args", ()):
+                args.setdefault(a.attribute, a)
+        for a in _kwargs.get("init_args", []):
+            args[a.attribute] = a
+        cls._args = list(args.values())
+        cls._arg_attributes = frozenset(args)
+        # Resolved once per class so serialisation does not redo the name conversion per node
+        cls._xml_args = [(a.attribute, _xml_name(a.attribute)) for a in cls._args if a not in BaseGTObject._args]
+        cls._set_args = cls._compile_set_args()
+        cls._set_xml_args = cls._compile_set_xml_args()
+        # Attach the create_* method to the Layer class
+        layer_method = cls._compile_layer_method()
+        setattr(Layer, layer_method.__name__, layer_method)
+
+    @classmethod
+    def _compile_layer_method(cls):
+        """
+        Generate the `Layer.create_*` method of the class.
+
+        Every argument becomes a real parameter in `_args` order, so positional and keyword
+        arguments are bound by the interpreter instead of being re-keyed on each call.
+        The leading required arguments are generated without a default.
+
+        Returns:
+            Callable: The `create_<class name>(self, ...)` function for this class.
+        """
         method_name = f"create_{cls.__name__.lower()}"
-        layer_method.__name__ = method_name
+        namespace = {"_create": cls.create}
+        parameters = ["self"]
+        required = True
+        for i, a in enumerate(cls._args):
+            # A parameter without a default cannot follow one with a default
+            required = required and not a.optional and a.default is None
+            if required:
+                parameters.append(a.attribute)
+            else:
+                namespace[f"_default_{i}"] = a.default
+                parameters.append(f"{a.attribute}=_default_{i}")
+        parameters.append("**kwargs")
+        arguments = ", ".join(f"{a.attribute}={a.attribute}" for a in cls._args)
+        lines = [
+            f"def {method_name}({', '.join(parameters)}):",
+            f"    return _create(self, {arguments}, **kwargs)",
+        ]
+        exec(compile("\n".join(lines), f"<Layer.{method_name}>", "exec"), namespace)
+        layer_method = namespace[method_name]
+        layer_method.__qualname__ = f"Layer.{method_name}"
+        return layer_method
+
+    @classmethod
+    def _compile_set_args(cls):
+        """
+        Generate a `_set_args` method specialised to the class' arguments.
 
-        # Set the signature of the function
-        layer_method.__signature__ = sig.replace(
-            parameters=[Parameter('self', Parameter.POSITIONAL_OR_KEYWORD)] + parameters)
+        The generated code unrolls the loop of `_set_args`, so every attribute
+        is validated and assigned with straight-line code and no `Arg` lookups.
+        Values are stored through the slot descriptors directly: a new object has
+        no cached XML to invalidate, so `__setattr__` is not involved.
 
-        # Attach the method to the Layer class
-        setattr(Layer, method_name, layer_method)
+        Returns:
+            Callable: The `_set_args(self, kwargs)` function for this class.
+        """
+        namespace = {"_object_setattr": object.__setattr__}
+        lines = ["def _set_args(self, kwargs):"]
+        for i, a in enumerate(cls._args):
+            namespace[f"_default_{i}"], namespace[f"_type_{i}"] = a.default, a.type
+            lines.append(f"    v = kwargs.get({a.attribute!r}, _default_{i})")
+            if not a.optional:
+                message = f"{cls.__name__} takes {a.attribute} attribute"
+                lines.append(f"    if v is None: raise TypeError({message!r})")
+            if a.type:
+                # Exact concrete types are checked first; isinstance against an ABC such as
+                # Number goes through __instancecheck__ and is only needed for the rare cases
+                namespace[f"_exact_{i}"] = EXACT_TYPES.get(a.type, frozenset((a.type,)))
+                message = f"{cls.__name__}.{a.attribute} requires a '{a.type.__name__}' but received a '%s'"
+                lines.append(f"    if v is not None and type(v) not in _exact_{i} and not isinstance(v, _type_{i}):")
+                lines.append(f"        raise TypeError({message!r} % type(v).__name__)")
+            slot = next((vars(c)[a.attribute] for c in cls.__mro__ if a.attribute in vars(c)), None)
+            if hasattr(slot, "__set__"):
+                namespace[f"_set_{i}"] = slot.__set__
+                lines.append(f"    _set_{i}(self, v)")
+            else:
+                lines.append(f"    _object_setattr(self, {a.attribute!r}, v)")
+        exec(compile("\n".join(lines), f"<{cls.__name__}._set_args>", "exec"), namespace)
+        return namespace["_set_args"]
 
-    def __init__(self, **kwargs):
+    @classmethod
+    def _compile_set_xml_args(cls):
+        """
+        Generate a `_set_xml_args` method specialised to the class' XML attributes.
+
+        Returns:
+            Callable: The `_set_xml_args(self, attrib)` function for this class.
+        """
+        namespace = {}
+        xml_defaults = {a.attribute: a.xml_default for a in cls._args}
+        lines = ["def _set_xml_args(self, attrib):", "    pass"]
+        for i, (attribute, xml_name) in enumerate(cls._xml_args):
+            lines.append(f"    v = self.{attribute}")
+            if xml_defaults[attribute] is not None:
+                namespace[f"_xml_default_{i}"] = xml_defaults[attribute]
+                lines.append(f"    if v is None: v = _xml_default_{i}")
+            lines.append(f"    if v is not None: attrib[{xml_name!r}] = str(v)")
+        exec(compile("\n".join(lines), f"<{cls.__name__}._set_xml_args>", "exec"), namespace)
+        return namespace["_set_xml_args"]
+
+    def _set_args(self, kwargs):
         for a in self._args:
             k, v = a.attribute, kwargs.get(a.attribute, a.default)
             if not (a.optional or v is not None):
                 raise TypeError(f"{self.__class__.__name__} takes {k} attribute")
-            if v is not None and a.type and not isinstance(v, (a.type,)):
+            if v is not None and a.type and type(v) is not a.type and not isinstance(v, a.type):
                 raise TypeError(
                     f"{self.__class__.__name__}.{k} requires "
                     f"a '{a.type.__name__}' but received a '{type(v).__name__}'"
                 )
             setattr(self, k, v)
 
-        self.fill = Colour.from_hex("#00000000")
-        self.stroke = Colour.from_hex("#00000000")
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in self._arg_attributes:
+            object.__setattr__(self, "_attrib", None)
+            object.__setattr__(self, "_start", None)
+
+    def __init__(self, **kwargs):
+        self._set_args(kwargs)
+
+        # Initial values bypass __setattr__, which only exists to catch later changes
+        object.__setattr__(self, "_attrib", None)
+        object.__setattr__(self, "_start", None)
+        object.__setattr__(self, "fill", self._DEFAULT_TRANSPARENT)
+        object.__setattr__(self, "stroke", self._DEFAULT_TRANSPARENT)
 
     @classmethod
     def create(cls, parent: Layer, index: int = -1, **kwargs):
-        return parent.insert_children(cls, index, **kwargs)
+        # Built here rather than through insert_children to avoid re-packing kwargs once more
+        return parent._insert(cls(**kwargs), index)
 
     def set_fill(self, colour: Union[str, Colour]):
         self.fill = colour
@@ -289,16 +484,60 @@ class BaseGTObject:
     def set_stroke(self, colour: Union[str, Colour]):
         self.stroke = colour
 
+    def _attributes(self) -> Dict[str, str]:
+        """
+        Get the XML attributes of the object, rebuilding them only after one of its arguments changed.
+
+        Returns:
+            Dict[str, str]: The attributes in output order. The dict is shared and must not be modified.
+        """
+        attrib = self._attrib
+        if attrib is None:
+            attrib = self._attrib = self._build_attributes()
+        return attrib
+
+    def _start_tag(self) -> str:
+        """
+        Get the serialised start tag of the object, rebuilding it only after one of its arguments changed.
+
+        Returns:
+            str: The start tag with all XML attributes, as written by `stream_xml`.
+        """
+        tag = self._start
+        if tag is None:
+            tag = self._start = start_tag(self._tag, self._attributes())
+        return tag
+
+    def _build_attributes(self) -> Dict[str, str]:
+        return {
+            "Name": self.name,
+            "Dimensions": f"{int(self.width)},{int(self.height)},0",
+            "Location": f"{int(self.x)},{int(self.y)},0",
+        }
+
+    def _stream_brushes(self, write: Callable[[str], object]) -> None:
+        fill_open, fill_close = self._fill_template
+        stroke_open, stroke_close = self._stroke_template
+        write(
+            fill_open + escape_attrib(str(self.fill)) + fill_close
+            + stroke_open + escape_attrib(str(self.stroke)) + stroke_close
+        )
+
     def to_xml(self, parent):
         raise NotImplementedError(f"Function `to_xml()` should be implemented for {self.__class__.__name__} class!")
 
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        raise NotImplementedError(
+            f"Function `stream_xml()` should be implemented for {self.__class__.__name__} class!"
+        )
+
 
 class TextBlock(BaseGTObject, init_args=[
     Arg("text", type=str, optional=False),
     Arg("font_family", type=str, optional=False),
     Arg("font_size", type=Number, optional=False),
     Arg("font_weight", type=str),
-    Arg("text_align", type=str),
+    Arg("text_align", type=str, xml_default="left"),
     Arg("vertical_align", type=str),
     Arg("word_wrapping", type=str),
     Arg("ignore_overhang", type=bool),
@@ -306,65 +545,81 @@ class TextBlock(BaseGTObject, init_args=[
     Arg("auto_size", type=str),
     Arg("data_flags", type=str)
 ]):
+    __slots__ = (
+        "text", "font_family", "font_size", "font_weight", "text_align", "vertical_align",
+        "word_wrapping", "ignore_overhang", "line_spacing", "auto_size", "data_flags"
+    )
+
     def get_properties(self) -> TextProperties:
         return TextProperties(**self)
 
     def to_xml(self, parent):
-        element = ET.SubElement(parent, self._tag,
-                                Name=self.name,
-                                Dimensions=f"%i,%i,%i" % (self.width, self.height, 0),
-                                Location="%i,%i,%i" % (self.x, self.y, 0),
-                                Text=self.text,
-                                **TextProperties(**self).to_xml())
-        fill = ET.SubElement(element, 'TextBlock.Fill')
-        ET.SubElement(fill, "Brush", Color=str(self.fill))
-        stroke = ET.SubElement(element, 'TextBlock.Stroke')
-        ET.SubElement(stroke, "Brush", Color=str(self.stroke))
+        element = ET.SubElement(parent, self._tag, self._attributes())
+        fill = ET.SubElement(element, self._fill_tag)
+        ET.SubElement(fill, "Brush", {"Color": str(self.fill)})
+        stroke = ET.SubElement(element, self._stroke_tag)
+        ET.SubElement(stroke, "Brush", {"Color": str(self.stroke)})
+
+    def _build_attributes(self) -> Dict[str, str]:
+        attrib = super()._build_attributes()
+        self._set_xml_args(attrib)
+        return attrib
+
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        write(self._start_tag())
+        self._stream_brushes(write)
+        write(f'</{self._tag}>')
 
 
 # Arg("bound"), Arg("padding")
 class Shape(BaseGTObject, init_args=[Arg("bound"), Arg("padding")]):
+    __slots__ = ("bound", "padding")
+
     def set_bounding(self, obj, padding=None):
         self.bound = obj.name
         if isinstance(padding, int):
             padding = (padding,)
-        pad_dimensions = len(padding) if padding else 0
-        if pad_dimensions == 1:
-            self.padding = PAD_STR % (padding[0], padding[0], padding[0], padding[0])
-        elif pad_dimensions < 4:
-            self.padding = PAD_STR % (padding[0], padding[1], padding[0], padding[1])
-        elif pad_dimensions == 4:
-            self.padding = PAD_STR % padding
-        else:
-            self.padding = PAD_STR % (0, 0, 0, 0)
+        indices = PAD_INDICES.get(len(padding)) if padding else None
+        if indices is None:
+            padding, indices = (0,), PAD_INDICES[1]
+        p0, p1, p2, p3 = (int(padding[i]) for i in indices)
+        self.padding = f"{p0},{p1},{p2},{p3}"
 
     def to_xml(self, parent):
-        element = ET.SubElement(parent, self._tag,
-                                Name=self.name,
-                                Dimensions=f"%i,%i,%i" % (self.width, self.height, 0),
-                                Location="%i,%i,%i" % (self.x, self.y, 0))
+        element = ET.SubElement(parent, self._tag, self._attributes())
         if self.bound and self.padding:
-            bounding = ET.SubElement(element, f'{self._tag}.Bounding')
-            ET.SubElement(bounding, "Bounding", Object=self.bound, Padding=self.padding)
-        fill = ET.SubElement(element, f'{self._tag}.Fill')
-        ET.SubElement(fill, "Brush", Color=str(self.fill))
-        stroke = ET.SubElement(element, f'{self._tag}.Stroke')
-        ET.SubElement(stroke, "Brush", Color=str(self.stroke))
+            bounding = ET.SubElement(element, self._bounding_tag)
+            ET.SubElement(bounding, "Bounding", {"Object": self.bound, "Padding": self.padding})
+        fill = ET.SubElement(element, self._fill_tag)
+        ET.SubElement(fill, "Brush", {"Color": str(self.fill)})
+        stroke = ET.SubElement(element, self._stroke_tag)
+        ET.SubElement(stroke, "Brush", {"Color": str(self.stroke)})
+
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        tag = self._tag
+        write(self._start_tag())
+        if self.bound and self.padding:
+            bounding = start_tag("Bounding", {"Object": self.bound, "Padding": self.padding}, empty=True)
+            write(f'<{self._bounding_tag}>' + bounding + f'</{self._bounding_tag}>')
+        self._stream_brushes(write)
+        write(f'</{tag}>')
 
 
 class Rectangle(Shape):
-    ...
+    __slots__ = ()
 
 
 class Ellipse(Shape):
-    ...
+    __slots__ = ()
 
 
 class Triangle(Shape):
-    ...
+    __slots__ = ()
 
 
 class Image(BaseGTObject):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         raise NotImplementedError("Image in not implemented yet!")
@@ -372,8 +627,13 @@ class Image(BaseGTObject):
     def to_xml(self, parent):
         pass
 
+    def stream_xml(self, write):
+        pass
+
 
 class Text3D(BaseGTObject):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         raise NotImplementedError("Text3D in not implemented yet!")
@@ -381,8 +641,13 @@ class Text3D(BaseGTObject):
     def to_xml(self, parent):
         pass
 
+    def stream_xml(self, write):
+        pass
+
 
 class Ticker(BaseGTObject):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         raise NotImplementedError("Ticker in not implemented yet!")
@@ -390,6 +655,9 @@ class Ticker(BaseGTObject):
     def to_xml(self, parent):
         pass
 
+    def stream_xml(self, write):
+        pass
+
 
 if __name__ == "__main__":
     Layer.__generate_stub__()
@@ -1,13 +1,13 @@
-import os.path
-import tempfile
-import xml.etree.ElementTree as ET
+import logging
 import zipfile
 
 from pyGTGraphics.layout import Layout
 from pyGTGraphics.objects import Layer, Root
 from pyGTGraphics.content import ContentTypes
 from pyGTGraphics.resources import Resources
-from pyGTGraphics.xml_utils import write_xml
+from pyGTGraphics.xml_utils import stream_to_bytes, xml_to_bytes
+
+logger = logging.getLogger(__name__)
 
 
 class Project:
@@ -20,6 +20,8 @@ class Project:
         types (ContentTypes): Manager for content types used in the project.
         filename (str): The name of the file to save the project to.
     """
+    __slots__ = ("document", "resources", "types", "filename", "layout")
+
     def __init__(self, width: int, height: int, filename=None, *args, **kwargs) -> None:
         """
         Initialize a new Project instance.
@@ -29,8 +31,6 @@ class Project:
             height (int): The height of the project canvas.
             filename (str, optional): The default filename to save the project to.
         """
-        self._dir = tempfile.TemporaryDirectory()
-
         self.document = Root(width, height)
         self.resources = Resources()
         self.types = ContentTypes()
@@ -40,56 +40,43 @@ class Project:
     def create_layer(self, name: str, x: int = None, y: int = None, width: int = None, height: int = None) -> Layer:
         return self.document.create_layer(name, x, y, width, height)
 
-    def save(self, filename=None) -> None:
+    def save(self, filename=None, pretty: bool = False) -> None:
         """
         Save the project to a file.
 
         Args:
             filename (str, optional): The filename to save the project to. If not
                                       provided, the instance's filename is used.
+            pretty (bool, optional): Whether to indent document.xml for readability. Indenting
+                                     requires building the element tree, so it is off by default.
 
         Raises:
             ValueError: If no filename is provided and the instance's filename is None.
         """
-        tree = self.document.to_xml()
-        # document.xml
-        ET.indent(tree, "  ")
-        write_xml(
-            tree,
-            os.path.join(self._dir.name, "document.xml"),
-            declared_encoding="utf-16", xml_declaration=True
-        )
-        # resources.xml
-        resources = Resources()
-        write_xml(
-            resources.to_xml(),
-            os.path.join(self._dir.name, "resources.xml"),
-            xml_declaration=False
-        )
-        # [Content_Types].xml
-        types = ContentTypes()
-        write_xml(
-            types.to_xml(),
-            os.path.join(self._dir.name, "[Content_Types].xml"),
-            xml_declaration=True
-        )
-        # thumbnail.png
-        # TODO: generate thumbnail
-
         output_file = filename or self.filename
         if not output_file:
             raise ValueError("Filename must be provided.")
 
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_STORED, allowZip64=False) as zf:
-            print(zf.filename)
-            for filename in os.listdir(self._dir.name):
-                f = os.path.join(self._dir.name, filename)
-                f = os.path.normpath(f)
-                if os.path.isfile(f):
-                    zf.write(f, filename)
+        # The members are tiny, so they are serialised in memory and written
+        # straight into the archive without staging them on disk.
+        if pretty:
+            document = xml_to_bytes(
+                self.document.to_xml(), declared_encoding="utf-16", xml_declaration=True, indent="  "
+            )
+        else:
+            document = stream_to_bytes(self.document.stream_xml, declared_encoding="utf-16", xml_declaration=True)
+        members = {
+            "document.xml": document,
+            "resources.xml": xml_to_bytes(self.resources.to_xml(), xml_declaration=False),
+            "[Content_Types].xml": xml_to_bytes(self.types.to_xml(), xml_declaration=True),
+        }
+        # thumbnail.png
+        # TODO: generate thumbnail
 
-    def __del__(self) -> None:
-        self._dir.cleanup()
+        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_STORED, allowZip64=False) as zf:
+            logger.debug("Saving %s", zf.filename)
+            for name, data in members.items():
+                zf.writestr(name, data)
 
     def __enter__(self) -> 'Project':
         """
@@ -120,11 +107,8 @@ class Project:
             bool: True if the exception was handled here, False otherwise.
         """
 
-        try:
-            if not exc_type:
-                self.save()
-        finally:
-            self._dir.cleanup()
+        if not exc_type:
+            self.save()
 
         return False
 
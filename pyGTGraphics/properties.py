@@ -7,9 +7,27 @@ Version: 1.0
 License: MIT License
 """
 
+import string
 from copy import copy
-from dataclasses import dataclass, asdict
-from typing import Dict, Optional
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_HEX_DIGITS = frozenset(string.hexdigits)
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """
+    Get the names of the dataclass fields of a class, resolved once per class.
+
+    Parameters:
+    - cls (type): A dataclass type.
+
+    Returns:
+    - Tuple[str, ...]: The field names in definition order.
+    """
+    return tuple(f.name for f in fields(cls))
 
 
 @dataclass
@@ -25,11 +43,48 @@ class ObjectProperties:
         Returns:
             Dict[str, str]: Dictionary representation of the dataclass fields.
         """
-        result = {k: str(v) for k, v in asdict(self).items() if v is None or include_none}
+        result = {}
+        # Fields are read directly: asdict() would deep-copy every value just to stringify it
+        for name in _field_names(type(self)):
+            v = getattr(self, name)
+            if v is not None or include_none:
+                result[name] = str(v)
+        result.update(kwargs)
         return result
 
 
+@lru_cache(maxsize=256)
+def _parse_hex(hex_string: str) -> Tuple[float, float, float, float]:
+    """
+    Parse an RGB or RGBA hexadecimal string into normalised colour components.
+
+    Parameters:
+    - hex_string (str): The colour as an RGB ('#RRGGBB') or RGBA ('#RRGGBBAA') hexadecimal string,
+      with or without a leading '#'.
+
+    Returns:
+    - Tuple[float, float, float, float]: The red, green, blue and alpha components, range 0.0 to 1.0.
+
+    Raises:
+    - ValueError: If the hex_string is not in the correct format.
+    """
+    hex_string = hex_string.strip("#")
+
+    # int() alone would also accept a 0x prefix, signs, underscores and surrounding whitespace
+    if len(hex_string) not in (6, 8) or not _HEX_DIGITS.issuperset(hex_string):
+        raise ValueError("Invalid color format, must be 6 or 8 hexadecimal characters")
+
+    # One base-16 parse for all channels, which are then extracted with shifts
+    value = int(hex_string, 16)
+    if len(hex_string) == 6:
+        value = value << 8 | 0xFF
+
+    return (value >> 24) / 255, (value >> 16 & 0xFF) / 255, (value >> 8 & 0xFF) / 255, (value & 0xFF) / 255
+
+
 class Colour:
+    __slots__ = ("_r", "_g", "_b", "_a", "_hex")
+
     def __init__(self, r: float, g: float, b: float, a: float) -> None:
         """
         Initialize a new Colour instance.
@@ -40,10 +95,13 @@ class Colour:
         - b (float): Blue component, range 0.0 to 1.0
         - a (float): Alpha (transparency) component, range 0.0 to 1.0
         """
-        self._r = min(max(r, .0), 1.)
-        self._g = min(max(g, .0), 1.)
-        self._b = min(max(b, .0), 1.)
-        self._a = min(max(a, .0), 1.)
+        # In-range components (the common case) skip the min/max calls entirely
+        self._r = r if .0 <= r <= 1. else min(max(r, .0), 1.)
+        self._g = g if .0 <= g <= 1. else min(max(g, .0), 1.)
+        self._b = b if .0 <= b <= 1. else min(max(b, .0), 1.)
+        self._a = a if .0 <= a <= 1. else min(max(a, .0), 1.)
+        # Components never change after construction, so the hex string is built once
+        self._hex = self._format(self._r, self._g, self._b, self._a)
 
     @staticmethod
     def _format(_r: float, _g: float, _b: float, _a: float) -> str:
@@ -59,11 +117,7 @@ class Colour:
         Returns:
         - str: The colour as a hexadecimal string.
         """
-        r = hex(int(255 * _r))[2:].zfill(2)
-        g = hex(int(255 * _g))[2:].zfill(2)
-        b = hex(int(255 * _b))[2:].zfill(2)
-        a = hex(int(255 * _a))[2:].zfill(2)
-        return f"#{a}{r}{g}{b}".upper()
+        return "#%02X%02X%02X%02X" % (int(255 * _a), int(255 * _r), int(255 * _g), int(255 * _b))
 
     @classmethod
     def from_hex(cls, hex_string: str) -> 'Colour':
@@ -80,18 +134,33 @@ class Colour:
         Raises:
         - ValueError: If the hex_string is not in the correct format.
         """
-        hex_string = hex_string.strip("#")
+        return cls(*_parse_hex(hex_string))
 
-        if len(hex_string) not in (6, 8):
-            raise ValueError("Invalid color format, must be 6 or 8 hexadecimal characters")
+    @classmethod
+    def from_hex_batch(cls, hex_strings: Iterable[str]) -> List['Colour']:
+        """
+        Create Colour instances from many RGB or RGBA hexadecimal strings at once.
 
-        r, g, b = (int(hex_string[i:i + 2], 16) / 255 for i in (0, 2, 4))
-        a = 1.0
+        Palettes repeat colours heavily, so each distinct string is parsed only once.
 
-        if len(hex_string) == 8:
-            a = int(hex_string[6:8], 16) / 255
+        Parameters:
+        - hex_strings (Iterable[str]): The colours as RGB ('#RRGGBB') or RGBA ('#RRGGBBAA')
+          hexadecimal strings, with or without a leading '#'.
 
-        return cls(r, g, b, a)
+        Returns:
+        - List[Colour]: The Colour instances, in the order of `hex_strings`.
+
+        Raises:
+        - ValueError: If any of the hex_strings is not in the correct format.
+        """
+        parsed: Dict[str, Colour] = {}
+        result = []
+        for hex_string in hex_strings:
+            colour = parsed.get(hex_string)
+            if colour is None:
+                colour = parsed[hex_string] = cls(*_parse_hex(hex_string))
+            result.append(colour)
+        return result
 
     def with_alpha(self, alpha: float) -> str:
         """
@@ -103,13 +172,15 @@ class Colour:
         Returns:
         - str: The colour as a hexadecimal string with the specified alpha value.
         """
+        if alpha == self._a:
+            return self._hex
         return self._format(self._r, self._g, self._b, alpha)
 
     def __str__(self):
-        return self._format(self._r, self._g, self._b, self._a)
+        return self._hex
 
     def __repr__(self):
-        return self.__str__()
+        return self._hex
 
 
 @dataclass(frozen=True)
@@ -137,16 +208,21 @@ class AnimationProperties(ObjectProperties):
     interpolation: Optional[str] = None
     direction: Optional[str] = None
 
+    # XML attribute names of the fields, in output order
+    _XML_FIELDS = (
+        ("Duration", "duration"),
+        ("Delay", "delay"),
+        ("Interpolation", "interpolation"),
+        ("Direction", "direction"),
+        # ("CenterAxis", "center_axis")
+    )
+
     def dict(self, include_none: bool = False, **kwargs) -> Dict[str, str]:
         target = kwargs.pop("target")
-        result = {
-            "Object": target.name,
-            "Duration": self.duration,
-            "Delay": self.delay,
-            "Interpolation": self.interpolation,
-            "Direction": self.direction,
-            # "CenterAxis": self.center_axis
-        }
-        result = {k: str(v) for k, v in result.items() if v is not None or include_none}
-        result.update(**kwargs)
+        result = {"Object": str(target.name)}
+        for xml_name, attribute in self._XML_FIELDS:
+            v = getattr(self, attribute)
+            if v is not None or include_none:
+                result[xml_name] = str(v)
+        result.update(kwargs)
         return result
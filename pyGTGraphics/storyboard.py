@@ -1,10 +1,13 @@
 import xml.etree.ElementTree as ET
-from typing import Optional
+from typing import Callable, Optional
 
 from .properties import AnimationProperties, AnimationDirection, AnimationInterpolation
+from .xml_utils import start_tag
 
 
 class Animation:
+    __slots__ = ("properties", "target")
+
     _tag = "None"
 
     def __init__(
@@ -16,14 +19,21 @@ class Animation:
         self.target = target
 
     def to_xml(self, parent):
-        return ET.SubElement(parent, self._tag, **self.properties.dict(target=self.target))
+        return ET.SubElement(parent, self._tag, self.properties.dict(target=self.target))
+
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        write(start_tag(self._tag, self.properties.dict(target=self.target), empty=True))
 
 
 class RevealAnimation(Animation):
+    __slots__ = ()
+
     _tag = "Reveal"
 
 
 class FadeAnimation(Animation):
+    __slots__ = ()
+
     _tag = "Fade"
 
 
@@ -32,11 +42,20 @@ class Storyboard(list):
         super().__init__()
         self.reversed = reverse
 
+    # The type checks are development aids; running under `python -O` strips them
+    # and leaves the plain list operations.
     def append(self, layer):
-        if not isinstance(layer, Animation):
+        if __debug__ and not isinstance(layer, Animation):
             raise TypeError("Composition can only contain Animation instances")
         super().append(layer)
 
+    def extend(self, layers):
+        if __debug__:
+            layers = list(layers)
+            if not all(isinstance(layer, Animation) for layer in layers):
+                raise TypeError("Composition can only contain Animation instances")
+        super().extend(layers)
+
     def to_xml(self, parent):
         storyboard = ET.SubElement(
             parent, "Storyboard",
@@ -45,3 +64,14 @@ class Storyboard(list):
         storyboard_inner = ET.SubElement(storyboard, "Storyboard.Animations")
         for a in self:
             a.to_xml(storyboard_inner)
+
+    def stream_xml(self, write: Callable[[str], object]) -> None:
+        write(start_tag("Storyboard", {"Type": "TransitionOut" if self.reversed else "TransitionIn"}))
+        if self:
+            write("<Storyboard.Animations>")
+            for a in self:
+                a.stream_xml(write)
+            write("</Storyboard.Animations>")
+        else:
+            write("<Storyboard.Animations />")
+        write("</Storyboard>")
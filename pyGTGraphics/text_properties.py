@@ -3,7 +3,7 @@ from numbers import Number
 from typing import Optional, Any
 
 
-class TextProperties(dict):
+class TextProperties:
     _aliases = {
         "data_flags": "DataFlags",
         "font_family": "FontFamily",
@@ -29,7 +29,8 @@ class TextProperties(dict):
                  auto_size: Optional[str] = None,
                  *args, **kwargs
                  ) -> None:
-        super().__init__()
+        self._active = None
+        self._xml = None
         self.font_family = font_family
         self.font_size = font_size
         self.font_weight = font_weight
@@ -53,17 +54,32 @@ class TextProperties(dict):
     def __setitem__(self, key: str, value: Number) -> None:
         setattr(self, key, value)
 
+    def __setattr__(self, key: str, value: Any) -> None:
+        object.__setattr__(self, key, value)
+        if key in self._aliases:
+            # The set of non-None properties and their XML form may have changed
+            object.__setattr__(self, "_active", None)
+            object.__setattr__(self, "_xml", None)
+
     def keys(self):
-        return [k for k in self._aliases.keys() if self[k] is not None]
+        active = self._active
+        if active is None:
+            active = self._active = tuple(k for k in self._aliases if getattr(self, k) is not None)
+        return active
 
     def items(self):
-        return ((key, self[key]) for key in self.keys())
+        return ((key, getattr(self, key)) for key in self.keys())
 
     def dict(self):
-        return {key: self[key] for key in self.keys()}
+        return {key: getattr(self, key) for key in self.keys()}
 
     def to_xml(self):
-        return {self._aliases[k]: str(self[k]) for k in self.keys()}
+        xml = self._xml
+        if xml is None:
+            aliases = self._aliases
+            xml = self._xml = {aliases[k]: str(getattr(self, k)) for k in self.keys()}
+        # Styles are shared between many text blocks, so callers get their own copy to modify
+        return xml.copy()
 
     def __iter__(self):
         return iter(self.keys())
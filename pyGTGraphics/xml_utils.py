@@ -7,16 +7,210 @@ Version: 1.0
 License: MIT License
 """
 
-from typing import Optional
+import io
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, Optional, TextIO
 import xml.etree.ElementTree as ET
 
+# Attribute values (tags, colours, coordinates) repeat across most nodes of a document,
+# so the escaped form of each string is memoised instead of being recomputed per node.
+# noinspection All
+_escape_attrib = lru_cache(maxsize=4096)(ET._escape_attrib)
+# noinspection All
+_escape_cdata = lru_cache(maxsize=4096)(ET._escape_cdata)
+
+# Public name for code that writes attribute values without going through ElementTree
+escape_attrib = _escape_attrib
+
+
+@contextmanager
+def _cached_escapes() -> Iterator[None]:
+    """
+    Temporarily replace the ElementTree escape helpers with their memoised versions.
+
+    Returns:
+    - Iterator[None]: A context in which serialisation uses the cached escape functions.
+    """
+    # noinspection All
+    escape_attrib, escape_cdata = ET._escape_attrib, ET._escape_cdata
+    ET._escape_attrib, ET._escape_cdata = _escape_attrib, _escape_cdata
+    try:
+        yield
+    finally:
+        ET._escape_attrib, ET._escape_cdata = escape_attrib, escape_cdata
+
+
+def start_tag(tag: str, attrib: Dict[str, str], empty: bool = False) -> str:
+    """
+    Build the serialised start tag of an element, as ElementTree would write it.
+
+    Parameters:
+    - tag (str): The element tag.
+    - attrib (Dict[str, str]): The element attributes, in output order.
+    - empty (bool): Whether to close the element immediately (`<tag ... />`).
+
+    Returns:
+    - str: The serialised start tag.
+    """
+    attributes = "".join(" %s=\"%s\"" % (k, _escape_attrib(v)) for k, v in attrib.items())
+    return "<%s%s%s" % (tag, attributes, " />" if empty else ">")
+
+
+class _UnsupportedNode(Exception):
+    """Raised by the indenting writer for nodes it leaves to ElementTree (comments, namespaces, QNames)."""
+
+
+def _write_indented(write: Callable[[str], object], elem: ET.Element, space: str, level: int = 0) -> None:
+    """
+    Serialise an element and its subtree, indenting it in the same pass.
+
+    The output matches `ET.indent` followed by `ElementTree.write`, without mutating
+    the `.text`/`.tail` of the tree or walking it twice. Tails of `elem` itself are
+    written by the caller.
+
+    Parameters:
+    - write (Callable): The function receiving the serialised text chunks.
+    - elem (Element): The element to serialise.
+    - space (str): The whitespace inserted for each indentation level.
+    - level (int): The indentation level of `elem`.
+
+    Raises:
+    - _UnsupportedNode: If the subtree contains a node only ElementTree knows how to write.
+    """
+    tag = elem.tag
+    if not isinstance(tag, str) or tag[:1] == "{":
+        raise _UnsupportedNode(tag)
+    write("<" + tag)
+    for k, v in elem.items():
+        if isinstance(k, ET.QName) or isinstance(v, ET.QName) or k[:1] == "{":
+            raise _UnsupportedNode(k)
+        write(" %s=\"%s\"" % (k, _escape_attrib(v)))
+    text = elem.text
+    if len(elem):
+        child_indentation = "\n" + space * (level + 1)
+        write(">" + (_escape_cdata(text) if text and text.strip() else child_indentation))
+        last = len(elem) - 1
+        for i, child in enumerate(elem):
+            _write_indented(write, child, space, level + 1)
+            tail = child.tail
+            if not tail or not tail.strip():
+                tail = child_indentation if i < last else "\n" + space * level
+            write(_escape_cdata(tail))
+        write("</" + tag + ">")
+    elif text:
+        write(">" + _escape_cdata(text) + "</" + tag + ">")
+    else:
+        write(" />")
+
+
+def _write_xml_text(
+    element_tree: ET.ElementTree,
+    file: TextIO,
+    declared_encoding: str,
+    xml_declaration: Optional[bool],
+    indent: Optional[str] = None
+) -> None:
+    """
+    Serialise an ElementTree object as text into the given text stream.
+
+    Parameters:
+    - element_tree (ElementTree): An XML ElementTree to serialise.
+    - file (TextIO): The text stream receiving the serialised XML.
+    - declared_encoding (str): The encoding declared in the XML header.
+    - xml_declaration (bool, optional): Whether to add an XML declaration at the start.
+    - indent (str, optional): The whitespace for each indentation level. If not provided,
+      the tree is written as is.
+
+    Returns:
+    - None
+    """
+    if xml_declaration:
+        file.write("<?xml version='1.0' encoding='%s'?>\n" % (declared_encoding,))
+    if indent is not None:
+        root = element_tree.getroot()
+        with io.StringIO() as buffer:
+            try:
+                _write_indented(buffer.write, root, indent)
+            except _UnsupportedNode:
+                ET.indent(element_tree, indent)
+            else:
+                file.write(buffer.getvalue())
+                if root.tail:
+                    file.write(_escape_cdata(root.tail))
+                return
+    # The "unicode" encoding makes ElementTree stream straight into the text stream,
+    # leaving both the encoding and the declaration to us.
+    with _cached_escapes():
+        element_tree.write(file, encoding="unicode", xml_declaration=False, short_empty_elements=True)
+
+
+def xml_to_bytes(
+    element_tree: ET.ElementTree,
+    encoding: Optional[str] = None,
+    declared_encoding: Optional[str] = None,
+    xml_declaration: Optional[bool] = None,
+    indent: Optional[str] = None
+) -> bytes:
+    """
+    Serialise an ElementTree object to bytes in memory, allowing for different encoding
+    and declared encoding within the XML declaration.
+
+    Parameters:
+    - element_tree (ElementTree): An XML ElementTree to serialise.
+    - encoding (str, optional): The encoding of the output bytes. Defaults to 'utf-8'.
+    - declared_encoding (str, optional): The encoding declared in the XML header.
+      If not provided, it defaults to the same value as `encoding`.
+    - xml_declaration (bool, optional): Whether to add an XML declaration at the start.
+      If not provided, the declaration is not added.
+    - indent (str, optional): The whitespace for each indentation level. If not provided,
+      the tree is written as is.
+
+    Returns:
+    - bytes: The encoded XML document.
+    """
+    _encoding = encoding or "utf-8"
+    with io.StringIO() as file:
+        _write_xml_text(element_tree, file, declared_encoding or _encoding, xml_declaration, indent)
+        return file.getvalue().encode(_encoding.lower(), errors="xmlcharrefreplace")
+
+
+def stream_to_bytes(
+    stream_xml: Callable[[Callable[[str], object]], None],
+    encoding: Optional[str] = None,
+    declared_encoding: Optional[str] = None,
+    xml_declaration: Optional[bool] = None
+) -> bytes:
+    """
+    Serialise a document produced by a `stream_xml(write)` function to bytes in memory,
+    without building an ElementTree.
+
+    Parameters:
+    - stream_xml (Callable): A function writing the serialised document through the `write` it is given.
+    - encoding (str, optional): The encoding of the output bytes. Defaults to 'utf-8'.
+    - declared_encoding (str, optional): The encoding declared in the XML header.
+      If not provided, it defaults to the same value as `encoding`.
+    - xml_declaration (bool, optional): Whether to add an XML declaration at the start.
+      If not provided, the declaration is not added.
+
+    Returns:
+    - bytes: The encoded XML document.
+    """
+    _encoding = encoding or "utf-8"
+    with io.StringIO() as file:
+        if xml_declaration:
+            file.write("<?xml version='1.0' encoding='%s'?>\n" % (declared_encoding or _encoding,))
+        stream_xml(file.write)
+        return file.getvalue().encode(_encoding.lower(), errors="xmlcharrefreplace")
+
 
 def write_xml(
     element_tree: ET.ElementTree,
     filename: str,
     encoding: Optional[str] = None,
     declared_encoding: Optional[str] = None,
-    xml_declaration: Optional[bool] = None
+    xml_declaration: Optional[bool] = None,
+    indent: Optional[str] = None
 ) -> None:
     """
     Write an ElementTree object to a file as XML, allowing for different file encoding 
@@ -30,19 +224,13 @@ def write_xml(
       If not provided, it defaults to the same value as `encoding`.
     - xml_declaration (bool, optional): Whether to add an XML declaration at the start of the file. 
       If not provided, the declaration is not added.
+    - indent (str, optional): The whitespace for each indentation level. If not provided,
+      the tree is written as is.
 
     Returns:
     - None
     """
-    _encoding = encoding or "utf-8"
-    _declared_encoding = declared_encoding or _encoding
-    with open(filename, "w", encoding=_encoding.lower(), errors="xmlcharrefreplace") as file:
-        if xml_declaration:
-            file.write("<?xml version='1.0' encoding='%s'?>\n" % (_declared_encoding,))
-        # TODO: The following operations are internal to ElementTree and should be replaced 
-        #   with public API calls if possible, as direct access to these functions may not
-        #   be compatible with all versions of Python's standard library.
-        # noinspection All
-        qnames, namespaces = ET._namespaces(element_tree._root, None)
-        # noinspection All
-        ET._serialize_xml(file.write, element_tree._root, qnames, namespaces, short_empty_elements=True)
+    # Encoded in memory in one go, then handed to the OS as a single write
+    data = xml_to_bytes(element_tree, encoding, declared_encoding, xml_declaration, indent)
+    with open(filename, "wb") as file:
+        file.write(data)
@@ -0,0 +1,40 @@
+import random
+import unittest
+
+from pyGTGraphics.properties import Colour, _parse_hex
+
+
+def parse_hex_by_slices(hex_string: str):
+    hex_string = hex_string.strip("#")
+    r, g, b = (int(hex_string[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    a = int(hex_string[6:8], 16) / 255 if len(hex_string) == 8 else 1.0
+    return r, g, b, a
+
+
+class ParseHexTest(unittest.TestCase):
+    def test_matches_slice_parser(self):
+        rng = random.Random(1234)
+        digits = "0123456789abcdefABCDEF"
+        for _ in range(2000):
+            hex_string = "".join(rng.choice(digits) for _ in range(rng.choice((6, 8))))
+            for candidate in (hex_string, "#" + hex_string):
+                self.assertEqual(_parse_hex(candidate), parse_hex_by_slices(candidate), candidate)
+
+    def test_known_colours(self):
+        self.assertEqual(str(Colour.from_hex("#FF2300")), "#FFFF2300")
+        self.assertEqual(str(Colour.from_hex("#E7E7ED80")), "#80E7E7ED")
+
+    def test_rejects_malformed_strings(self):
+        for hex_string in (
+            "0xFFFFFF", "0XFFFFFF", "#0x1234", "0x123456",
+            "+1FFFF", "#+1FFFF", "-1FFFF", "#-1FFFFFF",
+            "FF_FFF", "#FF_FFFFF",
+            " FFFFF", "FFFFF ", "FF FFF", "\tFFFFFFF",
+            "GGGGGG", "FFFFF", "FFFFFFF", "",
+        ):
+            with self.subTest(hex_string=hex_string), self.assertRaises(ValueError):
+                Colour.from_hex(hex_string)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from pyGTGraphics.objects import Root
+from pyGTGraphics.properties import Colour
+from pyGTGraphics.storyboard import FadeAnimation, RevealAnimation, Storyboard
+from pyGTGraphics.text_properties import TextProperties
+from pyGTGraphics.xml_utils import stream_to_bytes, xml_to_bytes
+
+
+class StreamXmlTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Root(1920, 1080)
+        self.root.create_layer("Empty layer")
+        layer = self.root.create_layer("Layer <1> & \"2\"", 10, 20, 300, 400)
+        self.text = layer.create_textblock(
+            "Text & <more>", 1, 2, 30, 40,
+            text="Say \"hi\" & <bye>\n\ttabbed é",
+            font_family="Century Gothic",
+            font_size=12.5,
+            font_weight="Bold",
+            text_align=TextProperties.TextAlignment.CENTER,
+            vertical_align=TextProperties.VerticalAlignment.BOTTOM,
+            word_wrapping=TextProperties.WordWrapping.WRAP,
+            ignore_overhang=True,
+            line_spacing=2,
+            auto_size=TextProperties.AutoSize.WIDTH_AND_HEIGHT,
+            data_flags="Flag",
+        )
+        self.text.set_fill(Colour.from_hex("#E7E7ED"))
+        self.rect = layer.create_rectangle("Rect", 5, 6, 70, 80)
+        self.rect.set_stroke(Colour.from_hex("#FF230080"))
+        self.rect.set_bounding(self.text, (15, 5))
+        layer.create_ellipse("Ellipse", 0, 0, 10, 10)
+
+        storyboard = Storyboard(reverse=True)
+        storyboard.append(RevealAnimation(self.rect, duration=0.5, delay=0.25,
+                                          direction="Left", interpolation="Linear"))
+        storyboard.append(FadeAnimation(self.text))
+        self.root.storyboards.append(storyboard)
+        self.root.storyboards.append(Storyboard())
+
+    def assertStreamMatchesTree(self) -> bytes:
+        streamed = stream_to_bytes(self.root.stream_xml)
+        self.assertEqual(streamed, xml_to_bytes(self.root.to_xml()))
+        return streamed
+
+    def test_stream_matches_tree(self):
+        self.assertStreamMatchesTree()
+
+    def test_empty_root_matches_tree(self):
+        self.root = Root(10, 20)
+        self.assertEqual(self.assertStreamMatchesTree(), b'<Composition Width="10" Height="20" />')
+
+    def test_cached_tags_follow_reassignment(self):
+        before = self.assertStreamMatchesTree()
+        self.rect.name = "Renamed"
+        self.text["width"] = 999
+        after = self.assertStreamMatchesTree()
+        self.assertNotEqual(before, after)
+        self.assertIn(b'<Rectangle Name="Renamed"', after)
+        self.assertIn(b'Dimensions="999,40,0"', after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import copy
+import io
+import random
+import unittest
+import xml.etree.ElementTree as ET
+
+from pyGTGraphics.xml_utils import xml_to_bytes
+
+
+def indent_with_etree(tree: ET.ElementTree, space: str = "  ") -> bytes:
+    tree = copy.deepcopy(tree)
+    ET.indent(tree, space)
+    buffer = io.BytesIO()
+    tree.write(buffer, encoding="utf-8", xml_declaration=False)
+    return buffer.getvalue()
+
+
+def random_tree(rng: random.Random) -> ET.ElementTree:
+    texts = [None, "", " ", "\n  ", "text", " a & b ", "<tag>", "x\ny"]
+    values = ["plain", "a & b", "<\"quoted\">", "line\nbreak", "tab\there", "é中", ""]
+
+    def build(parent, depth):
+        for _ in range(rng.randint(0, 3 if depth < 3 else 0)):
+            child = ET.SubElement(parent, rng.choice(["A", "B", "Layer.Composition"]))
+            for name in rng.sample(["Name", "Color", "Text"], rng.randint(0, 3)):
+                child.set(name, rng.choice(values))
+            child.text, child.tail = rng.choice(texts), rng.choice(texts)
+            build(child, depth + 1)
+
+    root = ET.Element("Composition", Width="10", Height="20")
+    root.text = rng.choice(texts)
+    build(root, 0)
+    return ET.ElementTree(root)
+
+
+class IndentedWriterTest(unittest.TestCase):
+    def assertSameAsEtree(self, tree: ET.ElementTree):
+        self.assertEqual(xml_to_bytes(tree, indent="  "), indent_with_etree(tree))
+
+    def test_text_tails_and_escaped_attributes(self):
+        root = ET.Element("Composition", Name='a & "b" <c>\n', Width="1")
+        layer = ET.SubElement(root, "Layer", Name="x > y")
+        layer.text = "  some text & more  "
+        ET.SubElement(layer, "Rectangle").tail = "tail"
+        ET.SubElement(layer, "Ellipse").text = "\n    "
+        ET.SubElement(root, "Empty").tail = "\n\n"
+        ET.SubElement(root, "Text").text = "<escaped>"
+        self.assertSameAsEtree(ET.ElementTree(root))
+
+    def test_whitespace_only_text_is_reindented(self):
+        root = ET.Element("Composition")
+        root.text = "\n"
+        child = ET.SubElement(root, "Layer")
+        child.text, child.tail = "   ", "\t"
+        ET.SubElement(child, "Rectangle").tail = "  "
+        self.assertSameAsEtree(ET.ElementTree(root))
+
+    def test_random_trees(self):
+        rng = random.Random(1234)
+        for _ in range(300):
+            self.assertSameAsEtree(random_tree(rng))
+
+    def test_comment_falls_back_to_etree(self):
+        root = ET.Element("Composition")
+        root.append(ET.Comment(" generated "))
+        ET.SubElement(root, "Layer", Name="a & b").text = "text"
+        self.assertSameAsEtree(ET.ElementTree(root))
+
+
+if __name__ == "__main__":
+    unittest.main()